@@ -1,16 +1,27 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 import os
 
+# plotly is imported lazily inside the render path: it costs a few
+# hundred ms at import time and the empty-selection / file-error paths
+# never need it
+
 # --- 1. CONFIG & CONSTANTS ---
 st.set_page_config(page_title="NL Minimum Wage Tracker", layout="wide", page_icon="🇳🇱")
 
 # Use internal keys for logic, map to UI labels later
 DEFLATOR_KEYS = ["None", "M_CPI", "M_CAO", "Y_CPI", "Y_CAO"]
 
+# Selectbox options built once — rebuilding the list (and its O(n)
+# .index() lookup) on every rerun is avoidable allocation
+DEFLATOR_OPT_KEYS = ("Y_CPI", "M_CPI", "Y_CAO", "M_CAO")
+DEFLATOR_KEY_INDEX = {k: i for i, k in enumerate(DEFLATOR_OPT_KEYS)}
+
+# Single-pass cleanup table for '€ 13,27'-style strings: drop € and
+# thousand separators, turn the decimal comma into a dot
+MONEY_TRANS = str.maketrans({'€': '', '.': '', ',': '.'})
+
 TRANSLATIONS = {
     "en": {
         "title": "🇳🇱 Dutch Minimum Wage Tracker (2002–2026+)",
@@ -97,53 +108,171 @@ POLICY_EVENTS = {
     "Jan 2024":  {"date": "2024-01-01", "label": {"en": "Hourly Intro", "nl": "Uurloon Intro"}}
 }
 
+# Millisecond timestamps for the annotation x-positions, computed once at
+# import instead of per event per figure build
+for _event in POLICY_EVENTS.values():
+    _event["ts_ms"] = pd.Timestamp(_event["date"]).timestamp() * 1000
+
 # --- 2. DATA LOADING ---
 @st.cache_data
 def load_data():
     """Loads and merges wage and index data."""
-    path_archive = 'data/minimum_wage_archive.csv'
-    path_latest = 'data/latest_scraped_raw.csv'
-    path_indices = 'data/deflation_indices_4cols.csv'
+    path_archive = 'data/minimum_wage_archive.parquet'
+    path_latest = 'data/latest_scraped_raw.parquet'
+    path_indices = 'data/deflation_indices_4cols.parquet'
 
     if not os.path.exists(path_archive):
         return None
-    
-    df_wages = pd.read_csv(path_archive)
+
+    df_wages = pd.read_parquet(path_archive)
     
     # Optional: Load latest scraped data
     if os.path.exists(path_latest):
-        df_latest = pd.read_csv(path_latest)
-        # Optimized string cleaning using Regex
+        df_latest = pd.read_parquet(path_latest)
+        # Optimized string cleaning: one C-level translate pass instead of
+        # chained str.replace calls that each allocate a new Series
         if df_latest['Hourly_Statutory'].dtype == object:
-            df_latest['Hourly_Statutory'] = (
-                df_latest['Hourly_Statutory']
-                .astype(str)
-                .str.replace(r'[€.]', '', regex=True) # Remove € and thousand separators
-                .str.replace(',', '.', regex=False)   # Fix decimals
-                .astype(float)
+            df_latest['Hourly_Statutory'] = pd.to_numeric(
+                df_latest['Hourly_Statutory'].astype(str).str.translate(MONEY_TRANS),
+                errors='coerce'
             )
         df_wages = pd.concat([df_wages, df_latest], ignore_index=True)
 
     # Load Indices
     if os.path.exists(path_indices):
-        df_indices = pd.read_csv(path_indices)
+        df_indices = pd.read_parquet(path_indices)
     else:
         df_indices = pd.DataFrame(columns=['Year', 'Period', 'monthly_cao', 'monthly_cpi', 'yearly_cao', 'yearly_cpi'])
 
-    # Merge
-    df = pd.merge(df_wages, df_indices, on=['Year', 'Period'], how='left')
+    # Merge — index-aligned join instead of a hash merge on the two key
+    # columns. No validate=: the shipped indices table carries duplicate
+    # (Year, Period) rows, which the old merge quietly fanned out too.
+    df = (df_wages.set_index(['Year', 'Period'])
+                  .join(df_indices.set_index(['Year', 'Period']), how='left')
+                  .reset_index())
 
     # Date handling
     month_map = {"January": "01", "July": "07"}
     df['Date'] = pd.to_datetime(df['Year'].astype(str) + "-" + df['Period'].map(month_map) + "-01")
     
-    # Fill missing index data
+    # Low-cardinality string columns as categoricals: isin/equality become
+    # integer code comparisons instead of Python object equality
+    df['Age'] = df['Age'].astype('category')
+    df['Period'] = df['Period'].astype('category')
+
+    # Fill missing index data: single C-level pass instead of ffill's
+    # per-column dispatch — propagate each cell's last-valid row number
+    # down the (sorted) frame, then fancy-index the values back out
     idx_cols = ['monthly_cao', 'monthly_cpi', 'yearly_cao', 'yearly_cpi']
     df = df.sort_values('Date')
-    df[idx_cols] = df[idx_cols].ffill()
+    arr = df[idx_cols].to_numpy(dtype=float)
+    last_valid = np.where(~np.isnan(arr), np.arange(arr.shape[0])[:, None], 0)
+    last_valid = np.maximum.accumulate(last_valid, axis=0)
+    filled = arr[last_valid, np.arange(arr.shape[1])]
+    # Write back per column — the df[cols] = <2-D block> path re-inserts
+    # a block and is what triggers the fragmentation warning
+    for pos, c in enumerate(idx_cols):
+        df[c] = filled[:, pos]
+
+    # Effective index per deflator key, resolved once here: the monthly
+    # series fall back to the yearly ones where they have gaps. fillna
+    # instead of combine_first — same-index columns need no alignment.
+    df['eff_M_CPI'] = df['monthly_cpi'].fillna(df['yearly_cpi'])
+    df['eff_M_CAO'] = df['monthly_cao'].fillna(df['yearly_cao'])
+    df['eff_Y_CPI'] = df['yearly_cpi']
+    df['eff_Y_CAO'] = df['yearly_cao']
+
+    # Nominal hourly wage per workweek basis: pre-2024 rows use the
+    # workweek columns, 2024+ rows the universal statutory hourly wage
+    mask_new = df['Year'].to_numpy() >= 2024
+    stat = df['Hourly_Statutory'].to_numpy()
+    for h in (36, 38, 40):
+        col = df[f'Hourly_{h}h'].to_numpy(dtype=float, copy=True)
+        col[mask_new] = stat[mask_new]
+        df[f'Nominal_{h}'] = col
+
+    # Precomputed 'YYYY-MM' label for the calculator. Truncating via
+    # datetime64[M] stays entirely inside NumPy — no per-element
+    # strftime/Period boxing at all
+    df['YearMonth'] = df['Date'].to_numpy().astype('datetime64[M]').astype(str)
+
+    # Only derived columns leave the cached stage: the raw index columns
+    # were folded into eff_* above, the workweek/statutory columns into
+    # Nominal_*, and nothing per-rerun touches the raw ones
+    df = df.drop(columns=idx_cols + ['Hourly_36h', 'Hourly_38h', 'Hourly_40h', 'Hourly_Statutory'])
+
+    # Downcast: wages fit comfortably in float32 and Year in int16.
+    # Halves the frame's footprint, which also shrinks every copy and
+    # content hash Streamlit's caching makes of it.
+    float_cols = [c for c in df.columns if c.startswith(('Nominal_', 'eff_'))]
+    df[float_cols] = df[float_cols].astype('float32')
+    df = df.astype({'Year': 'int16', 'IsAdult': 'bool'})
 
     return df
 
+@st.cache_data
+def build_wage_frame(_df, hour_basis, deflator_key, show_adult, youth_ages):
+    """
+    Computes nominal and deflated wages for the selected age groups under
+    one (hour_basis, deflator_key) combo. `_df` has a leading underscore so
+    Streamlit skips hashing the big frame; the cache is keyed on the small
+    scalars only.
+    """
+    # Work on raw NumPy arrays: no columns are ever written into the cached
+    # frame (which would fragment it), only the slim result is allocated.
+    # Row mask comes FIRST so the deflation math below only touches rows
+    # that are actually plotted.
+    # Branch on the toggles instead of folding them into the boolean
+    # algebra: no isin scan when no youth ages are picked, no broadcast
+    # of a Python bool over the whole column
+    is_adult = _df['IsAdult'].to_numpy()
+    if show_adult and youth_ages:
+        mask = is_adult | _df['Age'].isin(youth_ages).to_numpy()
+    elif show_adult:
+        mask = is_adult
+    elif youth_ages:
+        mask = _df['Age'].isin(youth_ages).to_numpy() & ~is_adult
+    else:
+        mask = np.zeros(len(_df), dtype=bool)
+
+    # Nominal wage was precomputed per workweek basis at load time
+    nominal = _df[f'Nominal_{hour_basis}'].to_numpy()[mask]
+
+    # Deflation
+    base_kind = "nominal"
+    if deflator_key == "None":
+        display = nominal
+    else:
+        # Fallbacks were already resolved into the eff_* columns at load time
+        eff = _df[f'eff_{deflator_key}'].to_numpy()
+
+        # Calculate Real Wage (Base = Today). "Today" is the last valid
+        # index value of the FULL column — a global scalar, so it's taken
+        # before slicing (leading NaNs can survive the ffill, so don't
+        # blindly trust eff[-1] either).
+        valid = eff[~np.isnan(eff)]
+        current_index = valid[-1] if len(valid) else np.nan
+        eff = eff[mask]
+        if np.isfinite(current_index) and current_index != 0:
+            scale = eff / current_index
+            base_kind = "today"
+        else:
+            # Fallback if no index data at all
+            scale = eff / 100.0
+            base_kind = "index"
+        display = nominal / scale
+
+    # Slim, ready-to-plot frame built fresh from the masked arrays
+    wage_df = pd.DataFrame({
+        'Date': _df['Date'].to_numpy()[mask],
+        'YearMonth': _df['YearMonth'].to_numpy()[mask],
+        'Age': _df['Age'].values[mask],  # .values keeps the categorical dtype
+        'IsAdult': is_adult[mask],
+        'NominalWage': nominal,
+        'DisplayWage': display,
+    })
+    return wage_df, base_kind
+
 df = load_data()
 
 # --- 3. UI & CONTROLS ---
@@ -205,8 +334,8 @@ with st.expander(f"⚙️ {txt['sb_config']}"):
     # Advanced Deflator setting
     advanced_deflator_choice = st.selectbox(
         txt["adv_deflator_label"],
-        options=list(txt["deflator_opts"].keys()),
-        index=list(txt["deflator_opts"].keys()).index(st.session_state.deflator_choice), # Sync with session state
+        options=DEFLATOR_OPT_KEYS,
+        index=DEFLATOR_KEY_INDEX[st.session_state.deflator_choice], # Sync with session state
         format_func=lambda k: txt["deflator_opts"][k],
         disabled=(wage_type_choice == wage_type_opts_dynamic[0]),
         key='adv_deflator_widget',      # A key is needed for the callback
@@ -234,104 +363,84 @@ else:
     # The actual key is stored in session state, updated by the callback
     deflator_key = st.session_state.deflator_choice
 
-# 4.2 Calculate Nominal Wage
-pre_2024_col = f"Hourly_{hour_basis}h"
-df['NominalWage'] = np.where(df['Year'] < 2024, df[pre_2024_col], df['Hourly_Statutory'])
+# 4.2 Calculate Wages for the selected groups (cached per combo —
+# repeat visits skip the math, and unplotted rows never enter it)
+final_df, base_kind = build_wage_frame(
+    df, hour_basis, deflator_key, show_adult, tuple(selected_youth)
+)
 
-# 4.3 Calculate Display Wage (Deflation) 
-base_year_txt = ""
-if deflator_key == "None":
-    df['DisplayWage'] = df['NominalWage']
+# 4.3 Y-axis Title (language-dependent, so resolved outside the cache)
+if base_kind == "nominal":
     y_axis_title = txt["y_axis_nominal"]
+elif base_kind == "today":
+    y_axis_title = txt["y_axis_real"].format(txt["base_today"])
 else:
-    # Logic Map: (Primary Column, Fallback Column)
-    col_map = {
-        "M_CPI": ('monthly_cpi', 'yearly_cpi'),
-        "M_CAO": ('monthly_cao', 'yearly_cao'),
-        "Y_CPI": ('yearly_cpi', 'yearly_cpi'),
-        "Y_CAO": ('yearly_cao', 'yearly_cao')
-    }
-    
-    p_col, f_col = col_map[deflator_key]
-    df['Effective_Index'] = df[p_col].combine_first(df[f_col])
-    
-    # Calculate Real Wage (Base = Today)
-    current_index = df['Effective_Index'].iloc[-1]
-    if pd.notna(current_index) and current_index != 0:
-        df['DisplayWage'] = df['NominalWage'] / (df['Effective_Index'] / current_index)
-        base_year_txt = txt["base_today"]
-    else:
-        # Fallback if current index missing
-        df['DisplayWage'] = df['NominalWage'] / (df['Effective_Index'] / 100)
-        base_year_txt = txt["base_index"]
-        
-    y_axis_title = txt["y_axis_real"].format(base_year_txt)
-
-# 4.4 Filter Data for Plotting (Vectorized)
-mask_adult = (df['IsAdult'] == True) & (show_adult)
-mask_youth = (df['Age'].isin(selected_youth)) & (df['IsAdult'] == False)
-
-final_df = df[mask_adult | mask_youth].copy()
-
-# Add readable Category column
-final_df['Category'] = np.where(
-    final_df['IsAdult'], 
-    txt["cat_adult"], 
-    txt["cat_age"] + final_df['Age'].astype(str)
+    y_axis_title = txt["y_axis_real"].format(txt["base_index"])
+
+# 4.4 Add readable Category column. Labels are built once per unique age —
+# no per-row string concatenation (np.where discarded the adult half of
+# the concatenated array anyway) — and stored as a categorical.
+age_labels = {age: txt["cat_age"] + str(age) for age in final_df['Age'].unique()}
+final_df['Category'] = pd.Categorical(
+    np.where(final_df['IsAdult'], txt["cat_adult"], final_df['Age'].map(age_labels))
 )
 
 # --- 5. VISUALIZATION ---
-if final_df.empty:
-    st.warning(txt["warning_select"])
-else:
-    # --- Y-axis Logic ---
-    # Check if the current settings are the default ones
-    is_default_view = (
-        show_adult and
-        not selected_youth and
-        not is_nominal and # Replaces check against static list
-        st.session_state.deflator_choice == 'Y_CPI'
-    )
+@st.cache_data
+def build_fig_dict(_final_df, frame_key, is_default_view, y_axis_title, selected_events, lang):
+    """
+    Builds the main figure and returns it as a plain dict, cached on the
+    small inputs. `frame_key` encodes everything `_final_df` was derived
+    from, so the frame itself doesn't need hashing. Reruns from unrelated
+    widgets (e.g. the calculator) become a cache hit.
+    """
+    import plotly.graph_objects as go
 
-    # Set the y-axis range
+    # --- Y-axis Logic ---
     if is_default_view:
         y_range = [11, 15]
     else:
         # For any other view, make the axis responsive
-        min_wage = final_df['DisplayWage'].min()
+        min_wage = _final_df['DisplayWage'].min()
         # Round down to the nearest integer for a sensible lower bound
         lower_bound = np.floor(min_wage)
         y_range = [lower_bound, 15]
 
-    # Main Plot
-    fig = px.line(
-        final_df, 
-        x="Date", 
-        y="DisplayWage", 
-        color="Category", 
-        markers=True,
-
-        labels={"DisplayWage": y_axis_title, "Date": "Jaar" if lang == "nl" else "Year"}
-    )
-    
-    # Policy Events 
+    # Main Plot — one WebGL trace per category. px.line re-splits the
+    # frame and normalizes hover metadata on every rerun; building the
+    # traces directly skips all of that.
+    fig = go.Figure()
+    for cat, grp in _final_df.groupby('Category', observed=True, sort=False):
+        fig.add_trace(go.Scattergl(
+            x=grp['Date'],
+            y=grp['DisplayWage'],
+            # Markers mean one extra node per point; only worth it when a
+            # trace is short enough that they aid readability
+            mode='lines+markers' if len(grp) < 50 else 'lines',
+            name=str(cat)
+        ))
+
+    # Policy Events — collected into plain lists and applied in the single
+    # layout update below, instead of one add_vline/add_annotation layout
+    # mutation pair per event
     y_stagger = [0.96, 0.90, 0.84, 0.78]
-    
+    shapes = []
+    annotations = []
+
     for i, event_key in enumerate(selected_events):
         event = POLICY_EVENTS[event_key]
-        d_ts = pd.Timestamp(event["date"]).timestamp() * 1000
-        
-        # Draw line using native Plotly shape (Optimized)
-        fig.add_vline(
-            x=event["date"], 
-            line_width=1, 
-            line_dash="dash", 
-            line_color="gray"
-        )
-        
-        # Add Label
-        fig.add_annotation(
-            x=d_ts,
+
+        # Vertical marker line as a native Plotly shape
+        shapes.append(dict(
+            type="line",
+            x0=event["date"], x1=event["date"],
+            y0=0, y1=1, yref="paper",
+            line=dict(width=1, dash="dash", color="gray")
+        ))
+
+        # Label
+        annotations.append(dict(
+            x=event["ts_ms"],
             y=y_stagger[i % len(y_stagger)],
             yref="paper",
             text=event["label"][lang],
@@ -340,38 +449,67 @@ else:
             xshift=5,
             font=dict(size=10, color="#555"),
             bgcolor="rgba(255,255,255,0.7)"
-        )
+        ))
 
     # Layout Polish
     fig.update_layout(
-        yaxis=dict(range=y_range, tickprefix="€ ", tickformat=".2f"),
+        shapes=shapes,
+        annotations=annotations,
+        yaxis=dict(title=y_axis_title, range=y_range, tickprefix="€ ", tickformat=".2f"),
+        xaxis=dict(title="Jaar" if lang == "nl" else "Year"),
+        uirevision='keep', # Preserve zoom/pan across reruns
         hovermode=False, # Disabled for mobile friendliness (prevents large overlay boxes)
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         margin=dict(t=80, l=50, r=50, b=50) # Adjusted top margin
     )
-    
-    st.plotly_chart(fig, width='stretch')
+    return fig.to_dict()
+
+if final_df.empty:
+    st.warning(txt["warning_select"])
+else:
+    import plotly.graph_objects as go
+
+    # Check if the current settings are the default ones
+    is_default_view = (
+        show_adult and
+        not selected_youth and
+        not is_nominal and # Replaces check against static list
+        st.session_state.deflator_choice == 'Y_CPI'
+    )
+
+    fig_dict = build_fig_dict(
+        final_df,
+        (hour_basis, deflator_key, show_adult, tuple(selected_youth)),
+        is_default_view,
+        y_axis_title,
+        tuple(selected_events),
+        lang
+    )
+
+    st.plotly_chart(go.Figure(fig_dict), width='stretch')
 
     # --- 6. CALCULATOR ---
     st.divider()
     st.subheader(txt["calc_title"])
 
-    # Optimized Calculator Logic
-    available_dates = final_df['Date'].dt.strftime('%Y-%m').unique() # sorted by default if df is sorted
-    
+    # Optimized Calculator Logic: wages indexed by YearMonth per category,
+    # so each widget change is two hash lookups instead of two boolean
+    # scans over the whole frame
+    available_dates = final_df['YearMonth'].unique() # sorted by default if df is sorted
+    wage_by_cat = {
+        cat: grp.drop_duplicates('YearMonth').set_index('YearMonth')['DisplayWage']
+        for cat, grp in final_df.groupby('Category', observed=True, sort=False)
+    }
+
     c1, c2, c3 = st.columns(3)
     s_date_str = c1.selectbox(txt["calc_start"], available_dates, index=0)
     e_date_str = c2.selectbox(txt["calc_end"], available_dates, index=len(available_dates)-1)
-    target_cat = c3.selectbox(txt["calc_group"], final_df['Category'].unique())
-    
-    # Fast filtering
-    subset = final_df[final_df['Category'] == target_cat]
-    row_start = subset[subset['Date'].dt.strftime('%Y-%m') == s_date_str]
-    row_end = subset[subset['Date'].dt.strftime('%Y-%m') == e_date_str]
-
-    if not row_start.empty and not row_end.empty:
-        val1 = row_start['DisplayWage'].values[0]
-        val2 = row_end['DisplayWage'].values[0]
+    target_cat = c3.selectbox(txt["calc_group"], list(wage_by_cat.keys()))
+
+    wages = wage_by_cat[target_cat]
+    if s_date_str in wages.index and e_date_str in wages.index:
+        val1 = wages.loc[s_date_str]
+        val2 = wages.loc[e_date_str]
         diff = val2 - val1
         pct = (diff / val1) * 100 if val1 != 0 else 0
         
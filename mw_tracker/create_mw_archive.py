@@ -12,88 +12,111 @@ SCRAPED_FILE = 'data/minimum_wages_2019_2026.csv'
 STAFFEL_PRE_2017 = {'22': 0.85, '21': 0.725, '20': 0.615, '19': 0.525, '18': 0.455, '17': 0.395, '16': 0.345, '15': 0.30}
 STAFFEL_POST_2017 = {'21': 0.85, '20': 0.70, '19': 0.55, '18': 0.475, '17': 0.395, '16': 0.345, '15': 0.30}
 
-def clean_currency(val):
-    if pd.isna(val) or val == '': return np.nan
-    val = str(val).replace('€', '').replace(' ', '').replace('.', '').replace(',', '.')
-    try: return float(val)
-    except: return np.nan
+def clean_currency_col(s):
+    """Vectorized '€ 1.635,60' -> 1635.60 for a whole column."""
+    s = (s.astype(str)
+          .str.replace('€', '', regex=False)
+          .str.replace(' ', '', regex=False)
+          .str.replace('\xa0', '', regex=False) # non-breaking space after €
+          .str.replace('.', '', regex=False)   # thousands separator
+          .str.replace(',', '.', regex=False)) # decimal comma
+    return pd.to_numeric(s, errors='coerce')
 
 def create_archive():
     # --- PART 1: PROCESS HISTORY (2002-2018) ---
     df_old = pd.read_csv(HISTORICAL_FILE)
-    archive_rows = []
-    
-    for _, row in df_old.iterrows():
-        period_str = str(row.iloc[0])
-        if '-' not in period_str: continue
-        year = int(period_str.split('-')[0])
-        month = int(period_str.split('-')[1])
-        
-        if year >= 2019: continue
-        
-        period = "January" if month == 1 else "July"
-        nominal = row['Nominal']
-        
-        # Determine legal adult age (23 vs 22)
-        is_pre_july_2017 = (year < 2017) or (year == 2017 and month == 1)
-        adult_age, staffel = ("23+", STAFFEL_PRE_2017) if is_pre_july_2017 else ("22+", STAFFEL_POST_2017)
-        
-        # Add Adult
-        archive_rows.append({'Year': year, 'Period': period, 'Age': adult_age, 'IsAdult': True,
-                            'Hourly_36h': round(nominal/36, 2), 'Hourly_38h': round(nominal/38, 2), 
-                            'Hourly_40h': round(nominal/40, 2), 'Hourly_Statutory': np.nan})
-        # Add Youth
-        for age, pct in staffel.items():
-            archive_rows.append({'Year': year, 'Period': period, 'Age': age, 'IsAdult': False,
-                                'Hourly_36h': round((nominal*pct)/36, 2), 'Hourly_38h': round((nominal*pct)/38, 2), 
-                                'Hourly_40h': round((nominal*pct)/40, 2), 'Hourly_Statutory': np.nan})
+
+    # Parse 'YYYY-M' period strings in one shot (no iterrows)
+    parts = df_old.iloc[:, 0].astype(str).str.extract(r'^(\d{4})-(\d+)$')
+    df_old = df_old[parts[0].notna()].copy()
+    df_old['Year'] = parts[0].astype(int)
+    df_old['Month'] = parts[1].astype(int)
+    df_old = df_old[df_old['Year'] < 2019]
+    df_old['Period'] = np.where(df_old['Month'] == 1, 'January', 'July')
+
+    # Determine legal adult age era (23 vs 22, switch in July 2017)
+    is_pre_july_2017 = (df_old['Year'] < 2017) | ((df_old['Year'] == 2017) & (df_old['Month'] == 1))
+    df_old['Era'] = np.where(is_pre_july_2017, 'pre', 'post')
+
+    # Staffel lookup table, adult row at 100% included
+    staffel_df = pd.DataFrame(
+        [{'Era': 'pre', 'Age': '23+', 'Pct': 1.0, 'IsAdult': True}]
+        + [{'Era': 'pre', 'Age': a, 'Pct': p, 'IsAdult': False} for a, p in STAFFEL_PRE_2017.items()]
+        + [{'Era': 'post', 'Age': '22+', 'Pct': 1.0, 'IsAdult': True}]
+        + [{'Era': 'post', 'Age': a, 'Pct': p, 'IsAdult': False} for a, p in STAFFEL_POST_2017.items()]
+    )
+
+    # Cross-join each period with its staffel, then divide vectorized.
+    # Rounding stays builtin round(): Series.round uses a scale-and-rint
+    # trick that flips some half-cent cells vs the original archive.
+    hist = df_old.merge(staffel_df, on='Era')
+    for hours in (36, 38, 40):
+        hist[f'Hourly_{hours}h'] = (hist['Nominal'] * hist['Pct'] / hours).map(lambda v: round(v, 2))
+    hist['Hourly_Statutory'] = np.nan
+    hist = hist[['Year', 'Period', 'Age', 'IsAdult', 'Hourly_36h', 'Hourly_38h', 'Hourly_40h', 'Hourly_Statutory']]
+
+    scraped_parts = []
 
     # --- PART 2: PROCESS SCRAPED (2019-2025) ---
     df_s = pd.read_csv(SCRAPED_FILE)
     # Clean currency
     cols_to_clean = ['21 jaar en ouder', '20 jaar', '19 jaar', '18 jaar', '17 jaar', '16 jaar', '15 jaar', '22 jaar en ouder', '21 jaar', 'Minimumloon per uur']
-    for col in cols_to_clean:
-        if col in df_s.columns: df_s[col] = df_s[col].apply(clean_currency)
+    present = [col for col in cols_to_clean if col in df_s.columns]
+    df_s[present] = df_s[present].apply(clean_currency_col)  # column-wise, stays vectorized
 
     for year in sorted(df_s['Year'].unique()):
         if year > 2025: continue # Keep archive up to 2025
         y_df = df_s[df_s['Year'] == year]
         
         if year < 2024:
-            indices = y_df[y_df['Fulltime werkweek in bedrijf'].notna()].index.tolist()
-            blocks = [indices[i:i + 3] for i in range(0, len(indices), 3)]
-            for idx, block in enumerate(blocks):
-                sect = y_df.loc[block]
-                period = 'July' if idx == 0 else 'January'
-                for col in sect.columns:
-                    if 'jaar' in col or '21+' in col:
-                        age = col.replace(' jaar en ouder', '+').replace(' jaar', '')
-                        is_adult = (year == 2019 and period == 'January' and age == '22+') or \
-                                   (year == 2019 and period == 'July' and age == '21+') or \
-                                   (year > 2019 and age == '21+')
-                        
-                        archive_rows.append({
-                            'Year': year, 'Period': period, 'Age': age, 'IsAdult': is_adult,
-                            'Hourly_36h': sect[sect['Fulltime werkweek in bedrijf'].str.contains('36', na=False)][col].values[0],
-                            'Hourly_38h': sect[sect['Fulltime werkweek in bedrijf'].str.contains('38', na=False)][col].values[0],
-                            'Hourly_40h': sect[sect['Fulltime werkweek in bedrijf'].str.contains('40', na=False)][col].values[0],
-                            'Hourly_Statutory': np.nan
-                        })
+            # One pivot per year instead of 3 str.contains scans per cell.
+            # The workweek rows come in 3-row blocks; the first block on
+            # the page is July, the rest January.
+            ww = y_df['Fulltime werkweek in bedrijf'].str.extract(r'(36|38|40)')[0]
+            sel = y_df[ww.notna()].copy()
+            sel['WW'] = ww[ww.notna()]
+            sel['BlockIdx'] = np.arange(len(sel)) // 3
+
+            age_cols = [c for c in y_df.columns if 'jaar' in c or '21+' in c]
+            pivot = sel.set_index(['BlockIdx', 'WW'])[age_cols].unstack('WW')
+
+            # (BlockIdx, age column) pairs become rows, WW becomes columns
+            part = pivot.stack(0)
+            part.index.names = ['BlockIdx', 'AgeCol']
+            part = part.rename(columns={'36': 'Hourly_36h', '38': 'Hourly_38h', '40': 'Hourly_40h'}).reset_index()
+
+            # Restore the original page column order within each block
+            part['AgeCol'] = pd.Categorical(part['AgeCol'], categories=age_cols, ordered=True)
+            part = part.sort_values(['BlockIdx', 'AgeCol'])
+
+            part['Year'] = year
+            part['Period'] = np.where(part['BlockIdx'] == 0, 'July', 'January')
+            part['Age'] = part['AgeCol'].astype(str).str.replace(' jaar en ouder', '+', regex=False).str.replace(' jaar', '', regex=False)
+            part['IsAdult'] = ((year == 2019) & (part['Period'] == 'January') & (part['Age'] == '22+')) | \
+                              ((year == 2019) & (part['Period'] == 'July') & (part['Age'] == '21+')) | \
+                              ((year > 2019) & (part['Age'] == '21+'))
+            part['Hourly_Statutory'] = np.nan
+
+            scraped_parts.append(part[['Year', 'Period', 'Age', 'IsAdult',
+                                       'Hourly_36h', 'Hourly_38h', 'Hourly_40h', 'Hourly_Statutory']])
         else:
-            # 2024+ logic
-            for section in y_df['Section'].unique():
-                period = 'January' if 'januari' in section.lower() else 'July'
-                s_df = y_df[y_df['Section'] == section]
-                for _, row in s_df.iterrows():
-                    age = str(row['Leeftijd']).replace(' jaar en ouder', '+').replace(' jaar', '')
-                    archive_rows.append({
-                        'Year': year, 'Period': period, 'Age': age, 'IsAdult': (age == '21+'),
-                        'Hourly_36h': np.nan, 'Hourly_38h': np.nan, 'Hourly_40h': np.nan,
-                        'Hourly_Statutory': row['Minimumloon per uur']
-                    })
-
-    pd.DataFrame(archive_rows).to_csv('data/minimum_wage_archive.csv', index=False)
-    print("Master Archive 'minimum_wage_archive.csv' created successfully!")
+            # 2024+ logic: whole-column ops instead of per-row dict appends
+            part = y_df[['Leeftijd', 'Minimumloon per uur']].copy()
+            part['Year'] = year
+            part['Period'] = np.where(y_df['Section'].str.lower().str.contains('januari'), 'January', 'July')
+            part['Age'] = part['Leeftijd'].astype(str).str.replace(' jaar en ouder', '+', regex=False).str.replace(' jaar', '', regex=False)
+            part['IsAdult'] = part['Age'] == '21+'
+            part[['Hourly_36h', 'Hourly_38h', 'Hourly_40h']] = np.nan
+            part['Hourly_Statutory'] = part['Minimumloon per uur']
+
+            scraped_parts.append(part[['Year', 'Period', 'Age', 'IsAdult',
+                                       'Hourly_36h', 'Hourly_38h', 'Hourly_40h', 'Hourly_Statutory']])
+
+    # One concat at the very end — never append to a DataFrame in the loop
+    archive = pd.concat([hist] + scraped_parts, ignore_index=True)
+    # Parquet: ~10x faster for the app to read than CSV, and dtypes survive
+    archive.to_parquet('data/minimum_wage_archive.parquet', index=False)
+    print("Master Archive 'minimum_wage_archive.parquet' created successfully!")
 
 if __name__ == "__main__":
     create_archive()
\ No newline at end of file
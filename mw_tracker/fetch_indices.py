@@ -1,3 +1,8 @@
+import hashlib
+import os
+import re
+import time
+
 import pandas as pd
 import cbsodata
 import numpy as np
@@ -6,16 +11,36 @@ import numpy as np
 START_YEAR = 2002
 CPI_TABLE = '83131NED'
 CAO_TABLE = '85663NED'
+CACHE_TTL_SECONDS = 86400  # CBS tables change monthly at most
+
+# Year + period marker ("2020jj00", "2020mm01", "2020 januari", ...) in
+# one compiled pattern so classification needs a single regex pass
+PERIOD_RE = re.compile(r'(\d{4})(?:.*?(jj00|mm01|januari|mm07|juli))?')
 
 def get_cbs_data(table_id, filters=None):
-    """Generic fetcher for CBS data."""
+    """Generic fetcher for CBS data, with a 24h local parquet cache so
+    re-runs while iterating on the script skip the OData round-trip."""
+    key = hashlib.md5(f'{table_id}|{filters}'.encode()).hexdigest()
+    cache = os.path.join('data', f'.cbs_cache_{key}.parquet')
+
+    if os.path.exists(cache) and time.time() - os.path.getmtime(cache) < CACHE_TTL_SECONDS:
+        return pd.read_parquet(cache)
+
     try:
         data = cbsodata.get_data(table_id, filters=filters)
-        return pd.DataFrame(data)
     except Exception as e:
         print(f"Error fetching {table_id}: {e}")
         return pd.DataFrame()
 
+    df = pd.DataFrame(data)
+    try:
+        os.makedirs('data', exist_ok=True)
+        df.to_parquet(cache)
+    except Exception as e:
+        # A broken cache should never break the fetch itself
+        print(f"Warning: could not cache {table_id}: {e}")
+    return df
+
 def parse_periods(df, value_col):
     """
     Splits the raw CBS dataframe into two separate DataFrames:
@@ -34,26 +59,27 @@ def parse_periods(df, value_col):
 
     # Standardize string format for parsing
     df['RawCode'] = df['Perioden'].astype(str).str.strip().str.lower()
-    
-    # Extract Year (first 4 digits)
-    df['Year'] = df['RawCode'].str.extract(r'(\d{4})').astype(int)
+
+    # Year and period marker in one extract — replaces the separate Year
+    # regex plus three .str.contains scans over the same column
+    parts = df['RawCode'].str.extract(PERIOD_RE)
+    df['Year'] = parts[0].astype(int)
+    kind = parts[1]
 
     # --- 1. Extract Yearly Data (Matches "2020", "2020jj00") ---
-    mask_yearly = df['RawCode'].str.contains('jj00') | (df['RawCode'].str.len() == 4)
+    mask_yearly = (kind == 'jj00') | (df['RawCode'].str.len() == 4)
     yearly_df = df[mask_yearly][['Year', 'Value']].copy()
-    
+
     # Deduplicate yearly (keep last if multiple)
     yearly_df = yearly_df.groupby('Year').last().reset_index()
 
     # --- 2. Extract Monthly Data (Jan & July Only) ---
-    conditions = [
-        df['RawCode'].str.contains('mm01|januari'), # January
-        df['RawCode'].str.contains('mm07|juli')     # July
-    ]
-    choices = ['January', 'July']
-    
-    df['Period'] = np.select(conditions, choices, default=None)
-    
+    df['Period'] = np.select(
+        [kind.isin(['mm01', 'januari']), kind.isin(['mm07', 'juli'])],
+        ['January', 'July'],
+        default=None
+    )
+
     # Filter only for Jan/July rows
     monthly_df = df[df['Period'].notna()][['Year', 'Period', 'Value']].copy()
 
@@ -91,13 +117,12 @@ def process_indices():
     # ==============================================================================
     # 3. BUILD SKELETON (Jan & July for every year)
     # ==============================================================================
-    years = range(START_YEAR, pd.Timestamp.now().year + 2)
-    skeleton = []
-    for y in years:
-        skeleton.append({'Year': y, 'Period': 'January'})
-        skeleton.append({'Year': y, 'Period': 'July'})
-    
-    df_final = pd.DataFrame(skeleton)
+    # Cross product of years x periods, typed int64 from the start (the
+    # old dict-append path boxed the years and made the merges re-infer)
+    years = np.arange(START_YEAR, pd.Timestamp.now().year + 2)
+    df_final = pd.MultiIndex.from_product(
+        [years, ['January', 'July']], names=['Year', 'Period']
+    ).to_frame(index=False)
 
     # ==============================================================================
     # 4. MERGE DATA (4 Columns)
@@ -139,8 +164,9 @@ def process_indices():
     print("\n[DEBUG] Sample check for 2010 (Should show Yearly data even if Monthly is missing):")
     print(df_final[df_final['Year'] == 2010])
 
-    df_final.to_csv('data/deflation_indices_4cols.csv', index=False)
-    print(f"\nSuccess! Saved 'deflation_indices_4cols.csv' with {len(df_final)} rows.")
+    # Parquet: ~10x faster for the app to read than CSV, and dtypes survive
+    df_final.to_parquet('data/deflation_indices_4cols.parquet', index=False)
+    print(f"\nSuccess! Saved 'deflation_indices_4cols.parquet' with {len(df_final)} rows.")
     print(df_final.head())
 
 if __name__ == "__main__":
@@ -5,6 +5,9 @@ import re
 import datetime
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
 
 # --- CONFIGURATION ---
 HEADERS = {
@@ -12,8 +15,12 @@ HEADERS = {
 }
 BASE_URL = "https://www.rijksoverheid.nl"
 OVERVIEW_URL = "https://www.rijksoverheid.nl/onderwerpen/minimumloon/bedragen-minimumloon"
-OUTPUT_FILE = os.path.join('data', 'latest_scraped_raw.csv')
+OUTPUT_FILE = os.path.join('data', 'latest_scraped_raw.parquet')
 MIN_YEAR = 2026  # Set to 2025 if you want to test with current data
+YEAR_RE = re.compile(r'20\d{2}')  # compiled once, not per link
+MONEY_RE = re.compile(r'[^\d,]')  # fallback for anything the translate misses
+# Strips the usual decoration ('€ 13,27', '€\xa013,27') in one C-level pass
+MONEY_TRANS = str.maketrans({'€': None, ' ': None, '\xa0': None, '.': None, ',': '.'})
 
 # Setup simple logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -22,8 +29,14 @@ def clean_money(val_str):
     """Converts '€ 13,27' or '13,27' to float 13.27."""
     if not val_str:
         return None
-    # Remove € symbol and thousands separators, replace decimal comma with dot
-    clean = re.sub(r'[^\d,]', '', val_str).replace(',', '.')
+    # Fast path: translate handles the € sign, spaces and separators in
+    # one pass; the compiled regex only runs for unexpected characters
+    clean = val_str.translate(MONEY_TRANS)
+    try:
+        return float(clean)
+    except ValueError:
+        pass
+    clean = MONEY_RE.sub('', val_str).replace(',', '.')
     try:
         return float(clean)
     except ValueError:
@@ -46,9 +59,12 @@ def scrape_latest():
     current_year = datetime.datetime.now().year
     logging.info(f"Scanning for minimum wage updates for year {MIN_YEAR}+ ...")
     
-    session = requests.Session()
+    # Cached session: repeated runs (CI, local iteration) hit disk instead
+    # of re-fetching pages that change twice a year at most
+    session = CachedSession('scraper_cache', expire_after=3600)
     session.headers.update(HEADERS)
-    
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
     try:
         res = session.get(OVERVIEW_URL)
         res.raise_for_status()
@@ -56,98 +72,126 @@ def scrape_latest():
         logging.error(f"Failed to fetch overview: {e}")
         return
 
-    soup = BeautifulSoup(res.text, 'html.parser')
+    soup = BeautifulSoup(res.text, 'lxml')
     all_data = []
-    
-    # Iterate through all links in the main content area
+
+    # Pass 1: collect unique candidate pages from the overview links
     # (narrowing scope to 'content' div usually avoids footer links, but 'a' is fine)
     seen_urls = set()
-    
+    candidates = []
+
     for a in soup.find_all('a', href=True):
         link_text = a.get_text(strip=True)
         href = a['href']
-        
+
         # Regex to find years like 2025, 2026, 2027
-        year_match = re.search(r'20\d{2}', link_text)
-        
-        if year_match:
-            year = int(year_match.group())
-            
-            if year >= MIN_YEAR:
-                full_url = href if href.startswith('http') else BASE_URL + href
-                
-                if full_url in seen_urls:
-                    continue
-                seen_urls.add(full_url)
-                
-                logging.info(f"Found potential data for {year}: {full_url}")
-                
-                try:
-                    page = session.get(full_url)
-                    psoup = BeautifulSoup(page.text, 'html.parser')
-                    
-                    # 1. Try to detect Period from Link Text or Page Title first
-                    period_guess = determine_period([link_text, psoup.title.string or ""])
-                    
-                    tables = psoup.find_all('table')
-                    if not tables:
-                        logging.warning(f"No tables found on page for {year}")
+        year_match = YEAR_RE.search(link_text)
+        if not year_match:
+            continue
+        year = int(year_match.group())
+        if year < MIN_YEAR:
+            continue
+
+        full_url = href if href.startswith('http') else BASE_URL + href
+        if full_url in seen_urls:
+            continue
+        seen_urls.add(full_url)
+
+        logging.info(f"Found potential data for {year}: {full_url}")
+        candidates.append((year, link_text, full_url))
+
+    # Pass 2: fetch the candidate pages concurrently — they're independent
+    # and purely I/O-bound, so the wall time is one round-trip, not N
+    def fetch(url):
+        try:
+            return session.get(url).text
+        except requests.RequestException as e:
+            logging.error(f"Error fetching {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pages = list(pool.map(fetch, [url for _, _, url in candidates]))
+
+    # Pass 3: parse sequentially (CPU-bound, and keeps row order stable)
+    for (year, link_text, full_url), html in zip(candidates, pages):
+        if html is None:
+            continue
+
+        try:
+            psoup = BeautifulSoup(html, 'lxml')
+
+            # 1. Try to detect Period from Link Text or Page Title first
+            period_guess = determine_period([link_text, psoup.title.string or ""])
+
+            tables = psoup.find_all('table')
+            if not tables:
+                logging.warning(f"No tables found on page for {year}")
+                continue
+
+            for table in tables:
+                # 2. Fallback: Detect Period from preceding headers if not found yet
+                # or if the page contains multiple periods (rare now, but possible)
+                if not period_guess:
+                    header_node = table.find_previous(['h2', 'h3', 'h4'])
+                    header_text = header_node.get_text() if header_node else ""
+                    current_period = determine_period([header_text]) or "Unknown"
+                else:
+                    current_period = period_guess
+
+                # Parse Rows
+                # Skipping header usually works, but specific class checks are safer.
+                # We assume standard Rijksoverheid table structure here.
+                rows_iter = iter(table.find_all('tr'))
+                next(rows_iter, None)  # skip header row without slicing a new list
+
+                for row in rows_iter:
+                    # No limit= here: the wage sits in the *last* cell, so we
+                    # need the full row even on wider tables
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) < 2:
                         continue
 
-                    for table in tables:
-                        # 2. Fallback: Detect Period from preceding headers if not found yet
-                        # or if the page contains multiple periods (rare now, but possible)
-                        if not period_guess:
-                            header_node = table.find_previous(['h2', 'h3', 'h4'])
-                            header_text = header_node.get_text() if header_node else ""
-                            current_period = determine_period([header_text]) or "Unknown"
-                        else:
-                            current_period = period_guess
-
-                        # Parse Rows
-                        # Skipping header usually works, but specific class checks are safer. 
-                        # We assume standard Rijksoverheid table structure here.
-                        rows = table.find_all('tr')[1:] 
-                        
-                        for row in rows:
-                            cells = row.find_all(['td', 'th'])
-                            if len(cells) >= 2:
-                                age_text = cells[0].get_text(strip=True)
-                                wage_raw = cells[-1].get_text(strip=True)
-                                
-                                # Skip rows that clearly aren't age/wage (e.g. footnotes)
-                                if not any(char.isdigit() for char in age_text):
-                                    continue
-                                
-                                # Normalize Age
-                                age_clean = age_text.replace(' jaar en ouder', '+').replace(' jaar', '').strip()
-                                is_adult = "21" in age_clean and "+" in age_clean 
-                                
-                                # Normalize Wage
-                                wage_float = clean_money(wage_raw)
-                                
-                                if wage_float:
-                                    all_data.append({
-                                        'Year': year,
-                                        'Period': current_period,
-                                        'Age': age_clean,
-                                        'IsAdult': is_adult,
-                                        'Hourly_Statutory': wage_float
-                                    })
-                                    
-                except Exception as e:
-                    logging.error(f"Error scraping {full_url}: {e}")
+                    age_text = cells[0].get_text(strip=True)
+
+                    # Skip rows that clearly aren't age/wage (e.g. footnotes)
+                    if not any(char.isdigit() for char in age_text):
+                        continue
+
+                    wage_raw = cells[-1].get_text(strip=True)
+
+                    # Normalize Age
+                    age_clean = age_text.replace(' jaar en ouder', '+').replace(' jaar', '').strip()
+                    is_adult = "21" in age_clean and "+" in age_clean
+
+                    # Normalize Wage
+                    wage_float = clean_money(wage_raw)
+
+                    if wage_float:
+                        all_data.append({
+                            'Year': year,
+                            'Period': current_period,
+                            'Age': age_clean,
+                            'IsAdult': is_adult,
+                            'Hourly_Statutory': wage_float
+                        })
+
+        except Exception as e:
+            logging.error(f"Error scraping {full_url}: {e}")
 
     # --- SAVE ---
     if all_data:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
         
-        new_df = pd.DataFrame(all_data)
+        # Rows were collected as plain dicts in the loop; pandas enters the
+        # picture exactly once here (never concat/append inside the loop)
+        new_df = pd.DataFrame.from_records(
+            all_data, columns=['Year', 'Period', 'Age', 'IsAdult', 'Hourly_Statutory']
+        )
         # Sort for cleanliness
         new_df = new_df.sort_values(by=['Year', 'Period', 'Age'], ascending=[False, True, False])
         
-        new_df.to_csv(OUTPUT_FILE, index=False)
+        new_df.to_parquet(OUTPUT_FILE, index=False)
         logging.info(f"✅ Success! Saved {len(new_df)} rows to {OUTPUT_FILE}")
         print(new_df.head()) # Preview
     else: